@@ -19,7 +19,7 @@ import discord
 
 from discord import TextChannel, Client, Guild, Message
 from tui import TUI
-from html_gen import HTMLGenerator
+from render_engine import RenderEngine
 
 log = logging.getLogger(__name__)
 
@@ -69,7 +69,7 @@ class DumpingBot(Client):
             log.exception(f"Error fetching messages for channel #{channel.name}")
         return messages
 
-    async def start_archiving_process(self, channels_to_archive: list[TextChannel], html_generator: HTMLGenerator):
+    async def start_archiving_process(self, channels_to_archive: list[TextChannel], render_engine: RenderEngine):
         if not self.guild:
             self.tui.log_message("[bold red]Error:[/bold red] Cannot start archiving without a selected guild.", "error")
             return
@@ -82,25 +82,25 @@ class DumpingBot(Client):
         output_dir_base = f"discord_archive_{self.guild.id}"
         os.makedirs(output_dir_base, exist_ok=True)
 
-        for i, channel in enumerate(channels_to_archive):
-            self.tui.log_message(
-                f"Processing channel [bold blue]#{channel.name}[/bold blue] ({i + 1}/{total_channels})...", "info")
-            messages = await self.fetch_messages_from_channel(channel)
-
-            if messages:
-                try:
-                    self.tui.log_message(f"Generating HTML for channel #{channel.name}...", "info")
-                    output_path = os.path.join(output_dir_base, f"{channel.name}_archive.html")
-                    await html_generator.generate_html(channel, messages, output_path)
-                    self.tui.log_message(f"HTML generated for #{channel.name}: {output_path}", "success")
-                except Exception as e:
-                    self.tui.log_message(f"[bold red]HTML generation error for #{channel.name}:[/bold red] {e}",
-                                         "error")
-                    log.exception(f"Error generating HTML for channel #{channel.name}")
-            else:
-                self.tui.log_message(f"No messages to archive in #{channel.name}.", "warning")
-
-            self.tui.update_overall_progress(i + 1, total_channels)
+        async with render_engine.session(self.guild, output_dir_base):
+            for i, channel in enumerate(channels_to_archive):
+                self.tui.log_message(
+                    f"Processing channel [bold blue]#{channel.name}[/bold blue] ({i + 1}/{total_channels})...", "info")
+                messages = await self.fetch_messages_from_channel(channel)
+
+                if messages:
+                    try:
+                        await render_engine.submit_channel(channel, messages)
+                    except Exception as e:
+                        self.tui.log_message(f"[bold red]HTML generation error for #{channel.name}:[/bold red] {e}",
+                                             "error")
+                        log.exception(f"Error generating HTML for channel #{channel.name}")
+                else:
+                    self.tui.log_message(f"No messages to archive in #{channel.name}.", "warning")
+
+                self.tui.update_overall_progress(i + 1, total_channels)
+
+            self.tui.log_message("All channels fetched, waiting for rendering to finish...", "info")
 
         self.tui.log_message("All channels processed.", "success")
         self.tui.update_overall_progress(total_channels, total_channels, description="Archiving completed")
\ No newline at end of file
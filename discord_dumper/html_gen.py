@@ -14,25 +14,57 @@
 
 import logging
 import re
-import aiofiles
 import jinja2
 
 from markdown import Markdown
 from jinja2 import FileSystemLoader, select_autoescape
 from jinja2.sandbox import SandboxedEnvironment
-from discord import TextChannel, Message
+from discord import Guild, Message
 from tui import TUI
+from writer import BufferedFileWriter
+
+
+def is_image(filename: str) -> bool:
+    return filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp'))
+
+
+def parse_markdown(md: Markdown, content: str) -> str:
+    content = re.sub(r'\|\|(.+?)\|\|', r'<span class="spoiler">\1</span>', content) # Spoilers
+
+    html_content = md.convert(content)
+    return html_content
+
+
+def capture_message(msg: Message) -> dict:
+    """
+    Copy the fields used by the templates out of a message into plain, picklable data.
+    Content is kept as raw text, markdown is converted at render time.
+    """
+    return {
+        "author_name": msg.author.display_name,
+        "author_avatar": msg.author.avatar.url if msg.author.avatar else None,
+        "timestamp": msg.created_at,
+        "content": msg.clean_content,
+        "attachments": [
+            {
+                "filename": attachment.filename,
+                "url": attachment.url,
+                "is_image": is_image(attachment.filename)
+            }
+            for attachment in msg.attachments
+        ],
+        "embeds": [embed.to_dict() for embed in msg.embeds]
+    }
 
 
 class HTMLGenerator:
     """
-    Generate HTML from discord messages.
+    Generate the archive index. Channel pages are rendered by render_engine.RenderEngine.
     """
 
     def __init__(self, theme_path: str, tui: TUI):
         self.theme_path = theme_path
         self.tui = tui
-        self.md = Markdown(extensions=['fenced_code', 'codehilite'])
 
         if not self.theme_path:
             raise ValueError("Path to the theme (theme_path) cannot be empty.")
@@ -42,57 +74,25 @@ class HTMLGenerator:
             enable_async=True
         )
 
-    def _is_image(self, filename: str) -> bool:
-        return filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp'))
-
-    def _parse_markdown(self, content: str) -> str:
-        content = re.sub(r'\|\|(.+?)\|\|', r'<span class="spoiler">\1</span>', content) # Spoilers
-
-        html_content = self.md.convert(content)
-        return html_content
-
-    async def generate_html(self, channel: TextChannel, messages: list[Message], output_path: str):
+    async def generate_index(self, guild: Guild, channels: list[dict], output_path: str):
         try:
-            template = self.env.get_template("channel.html")
-
-            rendered_messages = []
-            for msg in messages:
-                attachments_data = [
-                    {
-                        "filename": attachment.filename,
-                        "url": attachment.url,
-                        "is_image": self._is_image(attachment.filename)
-                    }
-                    for attachment in msg.attachments
-                ]
-
-                embeds_data = [embed.to_dict() for embed in msg.embeds]
-
-                rendered_messages.append({
-                    "author_name": msg.author.display_name,
-                    "author_avatar": msg.author.avatar.url if msg.author.avatar else None,
-                    "timestamp": msg.created_at,
-                    "content": self._parse_markdown(msg.clean_content),
-                    "attachments": attachments_data,
-                    "embeds": embeds_data
-                })
-
-            html_content = await template.render_async(
-                channel_name=channel.name,
-                messages=rendered_messages,
-            )
-
-            async with aiofiles.open(output_path, 'w', encoding='utf-8') as f:
-                await f.write(html_content)
+            template = self.env.get_template("index.html")
+
+            async with BufferedFileWriter(output_path) as f:
+                async for fragment in template.generate_async(
+                        guild_name=guild.name,
+                        channels=channels,
+                ):
+                    await f.write(fragment)
 
             self.tui.log_message(
-                f"HTML for #{channel.name} successful saved: [bold cyan]{output_path}[/bold cyan]", "success")
+                f"Index for {guild.name} successful saved: [bold cyan]{output_path}[/bold cyan]", "success")
 
         except jinja2.exceptions.TemplateNotFound:
             self.tui.log_message(
-                f"[bold red]Error:[/bold red] Template 'channel.html' not found in {self.theme_path}.", "error")
-            logging.error(f"Not found template 'channel.html' in {self.theme_path}")
+                f"Template 'index.html' not found in {self.theme_path}, skipping archive index.", "warning")
+            logging.warning(f"Not found template 'index.html' in {self.theme_path}")
         except Exception as e:
-            self.tui.log_message(f"[bold red]HTMl generation error:[/bold red] {e}", "error")
-            logging.exception("Error while HTML generation")
-            self.tui.traceback()
\ No newline at end of file
+            self.tui.log_message(f"[bold red]Index generation error:[/bold red] {e}", "error")
+            logging.exception("Error while index generation")
+            self.tui.traceback()
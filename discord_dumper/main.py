@@ -21,6 +21,7 @@ from typing import Optional
 from rich.traceback import install
 from bot import DumpingBot
 from html_gen import HTMLGenerator
+from render_engine import RenderEngine
 from tui import TUI
 
 
@@ -142,7 +143,7 @@ async def select_theme(tui: TUI) -> Optional[str]:
     return theme_path
 
 
-async def archive_channels(tui: TUI, bot: DumpingBot, main_progress_bar, html_gen: HTMLGenerator) -> bool:
+async def archive_channels(tui: TUI, bot: DumpingBot, main_progress_bar, render_engine: RenderEngine) -> bool:
     channels_to_archive: list[discord.TextChannel] = await tui.select_channels_interactive(bot.text_channels)
 
     if not channels_to_archive:
@@ -153,7 +154,7 @@ async def archive_channels(tui: TUI, bot: DumpingBot, main_progress_bar, html_ge
 
     with main_progress_bar:
         try:
-            await bot.start_archiving_process(channels_to_archive, html_gen)
+            await bot.start_archiving_process(channels_to_archive, render_engine)
             tui.log_message("[bold green]Archiving completed![/bold green]", "success")
             return True
         except Exception as e:
@@ -191,8 +192,9 @@ async def main():
                 continue
 
             html_gen: HTMLGenerator = HTMLGenerator(theme_path, tui)
+            render_engine: RenderEngine = RenderEngine(html_gen)
 
-            if not await archive_channels(tui, bot, main_progress_bar, html_gen):
+            if not await archive_channels(tui, bot, main_progress_bar, render_engine):
                 continue
 
             tui.show_msg_panel("Process Complete", "Archiving finished. You can close the program or start a new archiving process.")
@@ -0,0 +1,272 @@
+# Copyright 2025 @noverd aka @gagarinten aka @codtenalt
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import jinja2
+
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from markdown import Markdown
+from jinja2 import FileSystemLoader
+from jinja2.sandbox import SandboxedEnvironment
+from discord import TextChannel, Guild, Message
+from html_gen import HTMLGenerator, capture_message, parse_markdown
+from writer import AtomicFileWriter
+
+log = logging.getLogger(__name__)
+
+DEFAULT_WORKERS: int = os.cpu_count() or 1
+DEFAULT_PAGE_SIZE: int = 5000
+
+INDEX_FILENAME: str = "index.html"
+
+_worker_renderer: "PageRenderer | None" = None
+
+
+def page_filename(channel_name: str, channel_id: int, page: int) -> str:
+    # Channel names are not unique within a guild, the id keeps their pages apart.
+    if page == 1:
+        return f"{channel_name}_{channel_id}_archive.html"
+    return f"{channel_name}_{channel_id}_archive_{page}.html"
+
+
+def page_links(channel_name: str, channel_id: int, page_count: int) -> list[dict]:
+    return [
+        {"number": number, "filename": page_filename(channel_name, channel_id, number)}
+        for number in range(1, page_count + 1)
+    ]
+
+
+class PageRenderer:
+    """
+    Render one page of captured messages to a file. Lives in a worker process.
+    """
+
+    def __init__(self, theme_path: str):
+        self.md = Markdown(extensions=['fenced_code', 'codehilite'])
+        self.env = SandboxedEnvironment(loader=FileSystemLoader(theme_path))
+
+    def render(self, channel_name: str, channel_id: int, messages: list[dict], page: int, page_count: int,
+               output_dir: str) -> str:
+        template = self.env.get_template("channel.html")
+
+        for data in messages:
+            data["content"] = parse_markdown(self.md, data["content"])
+
+        output_path = os.path.join(output_dir, page_filename(channel_name, channel_id, page))
+        with AtomicFileWriter(output_path) as f:
+            f.write_fragments(template.generate(
+                channel_name=channel_name,
+                messages=messages,
+                page=page,
+                pages=page_links(channel_name, channel_id, page_count),
+                index_filename=INDEX_FILENAME,
+            ))
+        return output_path
+
+
+def _init_worker(theme_path: str):
+    global _worker_renderer
+    # Ctrl-C is handled by the parent, which lets already queued pages finish.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_renderer = PageRenderer(theme_path)
+
+
+def _render_page(job: dict) -> str:
+    return _worker_renderer.render(**job)
+
+
+class RenderEngine:
+    """
+    Shard captured channels into pages and render them on a pool of worker processes.
+    Each worker owns its own template environment and Markdown instance, the parent
+    only submits pages and writes the archive index once every page is done.
+    """
+
+    def __init__(self, html_generator: HTMLGenerator, workers: int | None = None, page_size: int | None = None):
+        self.html_generator = html_generator
+        self.tui = html_generator.tui
+
+        if workers is None:
+            workers = self._env_int("DUMPER_WORKERS", DEFAULT_WORKERS)
+        if page_size is None:
+            page_size = self._env_int("DUMPER_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+
+        if workers < 1:
+            raise ValueError("Number of workers (workers) must be positive.")
+        if page_size < 1:
+            raise ValueError("Page size (page_size) must be positive.")
+
+        self.workers = workers
+        self.page_size = page_size
+        self._executor: ProcessPoolExecutor | None = None
+        self._output_dir: str | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._in_flight: set[asyncio.Future] = set()
+        self._channels: dict[int, dict] = {}
+
+    def _env_int(self, name: str, default: int) -> int:
+        value = os.getenv(name)
+        if not value:
+            return default
+        try:
+            parsed = int(value)
+        except ValueError:
+            parsed = 0
+        if parsed < 1:
+            self.tui.log_message(
+                f"Invalid value {value!r} for {name}, expected a positive integer. Using {default}.", "warning")
+            log.warning(f"Invalid {name}={value!r}, falling back to {default}")
+            return default
+        return parsed
+
+    @asynccontextmanager
+    async def session(self, guild: Guild, output_dir: str) -> AsyncIterator["RenderEngine"]:
+        """
+        Run a pool for one archive. On exit, including interruption, pages that were already
+        queued are still rendered and the index is written for every complete channel.
+        """
+        # Spawned workers do not inherit the event loop, gateway connection or writer threads of the parent.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.html_generator.theme_path,),
+        )
+        self._output_dir = output_dir
+        # Bounds the captured messages held by the parent to a couple of pages per worker.
+        self._slots = asyncio.Semaphore(2 * self.workers)
+        self._in_flight = set()
+        self._channels = {}
+        try:
+            try:
+                yield self
+            except BaseException:
+                if self._in_flight:
+                    self.tui.log_message(
+                        "Archiving interrupted, finishing pages of already fetched channels...", "warning")
+                raise
+            finally:
+                await self._finish(guild)
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def submit_channel(self, channel: TextChannel, messages: list[Message]):
+        page_count = (len(messages) - 1) // self.page_size + 1
+        state = {
+            "id": channel.id,
+            "name": channel.name,
+            "message_count": len(messages),
+            "page_count": page_count,
+            "pending": page_count,
+            "failed": False,
+        }
+        self._channels[channel.id] = state
+
+        loop = asyncio.get_running_loop()
+        for page in range(1, page_count + 1):
+            await self._slots.acquire()
+            start = (page - 1) * self.page_size
+            job = {
+                "channel_name": channel.name,
+                "channel_id": channel.id,
+                "messages": [capture_message(msg) for msg in messages[start:start + self.page_size]],
+                "page": page,
+                "page_count": page_count,
+                "output_dir": self._output_dir,
+            }
+            try:
+                future = asyncio.wrap_future(self._executor.submit(_render_page, job), loop=loop)
+            except BaseException:
+                self._slots.release()
+                state["failed"] = True
+                raise
+            self._in_flight.add(future)
+            future.add_done_callback(partial(self._page_done, state))
+
+        self.tui.log_message(
+            f"Queued [bold]{page_count}[/bold] page(s) of #{channel.name} for rendering.", "info")
+
+    def _page_done(self, state: dict, future: asyncio.Future):
+        self._slots.release()
+        self._in_flight.discard(future)
+        state["pending"] -= 1
+
+        if future.cancelled():
+            state["failed"] = True
+            return
+        error = future.exception()
+        if error is None:
+            log.debug(f"Rendered {future.result()}")
+            return
+
+        if not state["failed"]:
+            if isinstance(error, jinja2.exceptions.TemplateNotFound):
+                self.tui.log_message(
+                    f"[bold red]Error:[/bold red] Template 'channel.html' not found in "
+                    f"{self.html_generator.theme_path}.", "error")
+            else:
+                self.tui.log_message(
+                    f"[bold red]HTML generation error for #{state['name']}:[/bold red] {error}", "error")
+            log.error(f"Error rendering page for channel #{state['name']}", exc_info=error)
+            self.tui.traceback()
+        state["failed"] = True
+
+    def _remove_pages(self, state: dict):
+        for page in page_links(state["name"], state["id"], state["page_count"]):
+            try:
+                os.unlink(os.path.join(self._output_dir, page["filename"]))
+            except FileNotFoundError:
+                pass
+
+    async def _finish(self, guild: Guild):
+        total = len(self._in_flight)
+        if total:
+            self.tui.update_overall_progress(0, total, description="Rendering pages")
+            for done, future in enumerate(asyncio.as_completed(list(self._in_flight)), start=1):
+                try:
+                    await future
+                except Exception:
+                    pass  # Reported by _page_done
+                self.tui.update_overall_progress(done, total, description="Rendering pages")
+
+        rendered = []
+        for state in self._channels.values():
+            if state["failed"] or state["pending"]:
+                # A channel with missing pages would leave dangling page links, drop it entirely.
+                self._remove_pages(state)
+                self.tui.log_message(
+                    f"Channel #{state['name']} was not fully rendered, its pages were removed.", "error")
+                continue
+            pages = page_links(state["name"], state["id"], state["page_count"])
+            rendered.append({
+                "id": state["id"],
+                "name": state["name"],
+                "message_count": state["message_count"],
+                "pages": pages,
+            })
+            self.tui.log_message(
+                f"HTML generated for #{state['name']}: "
+                f"{os.path.join(self._output_dir, pages[0]['filename'])}", "success")
+
+        if rendered:
+            await self.html_generator.generate_index(
+                guild, rendered, os.path.join(self._output_dir, INDEX_FILENAME))
@@ -0,0 +1,183 @@
+# Copyright 2025 @noverd aka @gagarinten aka @codtenalt
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import os
+import tempfile
+
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_BUFFER_SIZE: int = 2 * 1024 * 1024
+
+# os.umask can only be read by setting it, do it once at import before any writer threads exist.
+_UMASK: int = os.umask(0)
+os.umask(_UMASK)
+
+
+class AtomicFileWriter:
+    """
+    Write a file through a temporary sibling, then fsync and rename it into place.
+    """
+
+    def __init__(self, output_path: str, encoding: str = "utf-8"):
+        self.output_path = output_path
+        self.encoding = encoding
+        self._fd: int | None = None
+        self._tmp_path: str | None = None
+
+    def open(self):
+        directory = os.path.dirname(os.path.abspath(self.output_path))
+        self._fd, self._tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(self.output_path)}.", suffix=".tmp")
+        # mkstemp creates files as 0600, match a plain open(). os.fchmod is missing on Windows before 3.13.
+        try:
+            if hasattr(os, "fchmod"):
+                os.fchmod(self._fd, 0o666 & ~_UMASK)
+            else:
+                os.chmod(self._tmp_path, 0o666 & ~_UMASK)
+        except BaseException:
+            self.abort()
+            raise
+
+    def write(self, data: str):
+        view = memoryview(data.encode(self.encoding))
+        while view:
+            written = os.write(self._fd, view)
+            view = view[written:]
+
+    def write_fragments(self, fragments: Iterable[str], buffer_size: int = DEFAULT_BUFFER_SIZE):
+        buffer: list[str] = []
+        buffered = 0
+        for fragment in fragments:
+            buffer.append(fragment)
+            buffered += len(fragment)
+            if buffered >= buffer_size:
+                self.write("".join(buffer))
+                buffer.clear()
+                buffered = 0
+        if buffer:
+            self.write("".join(buffer))
+
+    def commit(self):
+        os.fsync(self._fd)
+        os.close(self._fd)
+        self._fd = None
+        os.replace(self._tmp_path, self.output_path)
+        self._tmp_path = None
+        self._fsync_directory()
+
+    def _fsync_directory(self):
+        # Make the rename itself durable. Not every platform can open or fsync a directory.
+        try:
+            dir_fd = os.open(os.path.dirname(os.path.abspath(self.output_path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+
+    def abort(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._tmp_path is not None:
+            try:
+                os.unlink(self._tmp_path)
+            except FileNotFoundError:
+                pass
+            self._tmp_path = None
+
+    def __enter__(self) -> "AtomicFileWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            try:
+                self.commit()
+            except BaseException:
+                self.abort()
+                raise
+        else:
+            self.abort()
+
+
+class BufferedFileWriter:
+    """
+    Collect rendered fragments into large buffers and flush them on a dedicated writer thread.
+    """
+
+    def __init__(self, output_path: str, buffer_size: int = DEFAULT_BUFFER_SIZE, encoding: str = "utf-8"):
+        self.buffer_size = buffer_size
+        self._file = AtomicFileWriter(output_path, encoding)
+        self._executor: ThreadPoolExecutor | None = None
+        self._buffer: list[str] = []
+        self._buffered: int = 0
+        self._pending: asyncio.Future | None = None
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def _drain(self):
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            await pending
+
+    async def write(self, fragment: str):
+        self._buffer.append(fragment)
+        self._buffered += len(fragment)
+        if self._buffered >= self.buffer_size:
+            await self.flush(wait=False)
+
+    async def flush(self, wait: bool = True):
+        if self._buffer:
+            chunk = "".join(self._buffer)
+            self._buffer.clear()
+            self._buffered = 0
+            # Only one chunk is in flight at a time, so the next buffer fills while this one is written.
+            await self._drain()
+            self._pending = asyncio.ensure_future(self._run(self._file.write, chunk))
+        if wait:
+            await self._drain()
+
+    async def __aenter__(self) -> "BufferedFileWriter":
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dumper-writer")
+        try:
+            await self._run(self._file.open)
+        except BaseException:
+            self._executor.shutdown(wait=False)
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                await self.flush()
+                await self._run(self._file.commit)
+            else:
+                try:
+                    await self._drain()
+                except Exception:
+                    pass
+                await self._run(self._file.abort)
+        except BaseException:
+            await self._run(self._file.abort)
+            raise
+        finally:
+            self._buffer.clear()
+            self._executor.shutdown(wait=False)